@@ -1,7 +1,10 @@
-import random
 import math
+import zlib
 from enum import Enum
-from collections import defaultdict
+
+import numpy as np
+
+from bounds import load_lower_bound
 
 class NeighType(Enum):
     """
@@ -17,6 +20,25 @@ class NeighType(Enum):
 ADHOC_SWP = 0.8
 ADHOC_REV = 1 - ADHOC_SWP
 
+def make_rng(seed, case, instance, run):
+    """
+    Creates the random generator of a single run.
+
+    Every (case, instance, run) gets its own independent stream spawned from the master seed,
+    so a run draws the same numbers whether it is executed alone, serially or in a pool.
+
+    Args:
+        seed (int): The master seed.
+        case (str): The name of the configuration (e.g. "case1").
+        instance (str): The name of the data file (e.g. "tai12a.dat").
+        run (int): The index of the run.
+
+    Returns:
+        np.random.Generator: The random generator of the run.
+    """
+    spawn_key = (zlib.crc32(case.encode()), zlib.crc32(instance.encode()), run)
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=spawn_key))
+
 class QAP:
     #<- Taboo Table Class
     class Taboo:
@@ -27,6 +49,12 @@ class QAP:
             tenure (int): The number of iterations a move remains in the Taboo list.
             taboo (dict): A dictionary representing the Taboo list, where keys are moves (tuples)
                           and values are their remaining tenure.
+            frequencies (np.ndarray): The long-term memory, an n x n array where `frequencies[i][k]`
+                          is the number of iterations `i` was assigned to `k` (used if `use_frequencies`).
+            diversify_after (int): The number of iterations without improving the best solution
+                          after which a diversification phase starts.
+            diversify_length (int): The number of iterations of a diversification phase.
+            penalty_weight (float): The weight of the frequency penalties during diversification.
         Methods:
             create_taboo_table():
                 Initializes the Taboo list as an empty dictionary.
@@ -36,16 +64,28 @@ class QAP:
                 Adds a move to the Taboo list with the specified tenure. Ensures the move is stored in a consistent order.
             is_taboo(p):
                 Checks if a move is currently in the Taboo list.
+            record_move(old_sol, positions, improved):
+                Updates the frequencies of the changed positions and the diversification phase.
+            penalties(sol, candidates, fitness):
+                Computes the frequency penalties of the candidates during a diversification phase.
         """
-        def __init__(self, n, tenure=5, use_frequencies=False):
+        def __init__(self, n, tenure=5, use_frequencies=False, diversify_after=100, diversify_length=20,
+                     penalty_weight=1.0):
             self.n = n
             self.tenure = tenure
             self.use_frequencies = use_frequencies
+            self.diversify_after = diversify_after
+            self.diversify_length = diversify_length
+            self.penalty_weight = penalty_weight
             self.create_taboo_table()
 
         def create_taboo_table(self):
             self.taboo = dict()
-            self.taboo_frequencies = defaultdict(int)
+            self.frequencies = np.zeros((self.n, self.n), dtype=np.int64)
+            self.assigned_since = np.zeros(self.n, dtype=np.int64)
+            self.iteration = 0
+            self.stall = 0
+            self.diversifying = 0
 
         def update_taboo_table(self):
             to_be_removed = []
@@ -60,17 +100,38 @@ class QAP:
             if p[0] > p[1]:
                 p[0], p[1] = p[1], p[0]
             self.taboo[p] = self.tenure
-            if self.use_frequencies:
-                self.taboo_frequencies[p] += 1
-                if self.taboo_frequencies[p] > self.tenure*2:
-                    self.taboo[p] = self.tenure * 4
-                    self.taboo_frequencies[p] //= 2
 
         def is_taboo(self, p):
             return p in self.taboo
+
+        def record_move(self, old_sol, positions, improved):
+            self.iteration += 1
+            if not self.use_frequencies:
+                return
+            # Only the changed positions end their assignment, so the update is O(1) for a swap
+            for i in positions:
+                self.frequencies[i, old_sol[i]] += self.iteration - self.assigned_since[i]
+                self.assigned_since[i] = self.iteration
+
+            if self.diversifying > 0:
+                self.diversifying -= 1
+            self.stall = 0 if improved else self.stall + 1
+            if self.stall >= self.diversify_after:
+                self.stall = 0
+                self.diversifying = self.diversify_length
+
+        def penalties(self, sol, candidates, fitness):
+            if self.diversifying == 0 or len(candidates) == 0:
+                return np.zeros(len(candidates))
+            cands = np.array(candidates)
+            changed = cands != np.asarray(sol)
+            # Share of the past iterations each new assignment was already used
+            used = self.frequencies[np.arange(self.n), cands] / self.iteration
+            return self.penalty_weight * fitness / self.n * (used * changed).sum(axis=1)
     # End of Taboo Table Class ->
 
-    def __init__(self, data_file="data/tai12a.dat", tenure=5, neigh_type=NeighType.SWAP, use_frequencies=False):
+    def __init__(self, data_file="data/tai12a.dat", tenure=5, neigh_type=NeighType.SWAP, use_frequencies=False,
+                 diversify_after=100, diversify_length=20, penalty_weight=1.0, rng=None):
         """
         Initializes the QAP (Quadratic Assignment Problem) solver.
 
@@ -79,16 +140,29 @@ class QAP:
                             Defaults to "data/tai12a.dat".
             tenure (int): The tenure value for the Taboo search algorithm, which determines
                         how long a move remains taboo. Defaults to 5.
+            use_frequencies (bool): Whether to keep the long-term frequency memory and use it
+                        for diversification phases. Defaults to False.
+            diversify_after (int): The number of iterations without improvement after which
+                        a diversification phase starts. Defaults to 100.
+            diversify_length (int): The number of iterations of a diversification phase.
+                        Defaults to 20.
+            penalty_weight (float): The weight of the frequency penalties. Defaults to 1.0.
+            rng (np.random.Generator): The random generator of the run, see `make_rng`.
+                        Defaults to a freshly seeded generator.
 
         Attributes:
             tenure (int): The tenure value for the Taboo search algorithm.
             taboo (Taboo): An instance of the Taboo class initialized with the problem size
                         and the specified tenure.
         """
+        self.data_file = data_file
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.read_data(data_file)
         self.tenure = tenure
         self.neigh_type = neigh_type
-        self.taboo = self.Taboo(self.n, tenure=self.tenure, use_frequencies=use_frequencies)
+        self.taboo = self.Taboo(self.n, tenure=self.tenure, use_frequencies=use_frequencies,
+                                diversify_after=diversify_after, diversify_length=diversify_length,
+                                penalty_weight=penalty_weight)
 
     def add_taboo(self, p):
         """
@@ -110,6 +184,45 @@ class QAP:
         """
         self.taboo.update_taboo_table()
 
+    def record_move(self, old_solution, new_solution, improved):
+        """
+        Records an accepted move in the long-term frequency memory.
+
+        Args:
+            old_solution (list): The solution before the move.
+            new_solution (list): The accepted neighbor, as returned by `get_neighbors`.
+            improved (bool): Whether the move improved the best solution found so far.
+        """
+        self.taboo.record_move(old_solution[0], new_solution[3], improved)
+
+    def penalties(self, solution, candidates):
+        """
+        Computes the frequency penalties of the candidates.
+
+        During a diversification phase, every assignment changed by a candidate is penalized
+        in proportion to the share of the past iterations it was already used. Outside of a
+        diversification phase, all the penalties are zero.
+
+        Args:
+            solution (list): The current solution.
+            candidates (list): The neighbors of the current solution, as returned by `get_neighbors`.
+
+        Returns:
+            np.ndarray: The penalty of each candidate, to be added to its fitness value.
+        """
+        return self.taboo.penalties(solution[0], [c[0] for c in candidates], solution[2])
+
+    def lower_bound(self):
+        """
+        Returns the Gilmore-Lawler lower bound of the problem instance.
+
+        The bound is computed once per instance and cached next to the data file.
+
+        Returns:
+            int: A lower bound on the fitness value of any solution.
+        """
+        return load_lower_bound(self.data_file, self.d, self.f)
+
     def fitness_f(self, sol):
         """
         Calculates the fitness value of a given solution for the Quadratic Assignment Problem (QAP).
@@ -137,7 +250,7 @@ class QAP:
         Initializes a solution for the Quadratic Assignment Problem (QAP).
 
         This method generates an initial solution by creating a list of integers 
-        from 0 to n-1 (where n is the problem size), shuffling the list randomly, 
+        from 0 to n-1 (where n is the problem size), shuffling the list with `rng`, 
         and then calculating its fitness using the provided fitness function. 
         The solution is stored as a list containing the shuffled permutation, 
         a placeholder for additional data (set to None), and the fitness value.
@@ -146,8 +259,7 @@ class QAP:
             list: A list containing the shuffled solution, a placeholder (None), 
                 and the fitness value of the solution.
         """
-        self.solution = list(range(self.n))
-        random.shuffle(self.solution)
+        self.solution = self.rng.permutation(self.n).tolist()
         self.solution = [self.solution, None, self.fitness_f(self.solution)]
         return self.solution
 
@@ -155,6 +267,8 @@ class QAP:
         """
         Generate a list of neighboring solutions by swapping elements in the current solution.
 
+        The random moves are drawn from `rng` in batches rather than one call per move.
+
         Args:
             solution (list): The current solution represented as a list.
             count (int, optional): The number of neighbors to generate. Defaults to 5.
@@ -164,11 +278,17 @@ class QAP:
                 - The new solution after the swap (list).
                 - The action performed as a tuple (a, b), where `a` and `b` are the indices of the swapped elements.
                 - The fitness value of the neighbor, initialized to infinity (math.inf).
+                - The positions changed by the move (tuple).
         """
         neighs = []
         cur_actions = []
+        draws = []
         while count > 0:
-            a, b = sorted(random.choices(list(range(self.n)), k=2))
+            if not draws:
+                pairs = np.sort(self.rng.integers(0, self.n, size=(2 * count, 2)), axis=1).tolist()
+                kinds = self.rng.random(2 * count).tolist()
+                draws = list(zip(pairs, kinds))[::-1]
+            (a, b), kind = draws.pop()
             if self.taboo.is_taboo((a, b)) or (a, b) in cur_actions:
                 continue
             cur_actions.append((a, b))
@@ -176,17 +296,19 @@ class QAP:
             
             adhoc_neigh = 0
             if self.neigh_type == NeighType.ADHOC:
-                if random.random() < ADHOC_SWP:
+                if kind < ADHOC_SWP:
                     adhoc_neigh = 1
                 else:
                     adhoc_neigh = 2
             
             if self.neigh_type == NeighType.SWAP or adhoc_neigh == 1:
                 sn[a], sn[b] = sn[b], sn[a]
+                positions = (a, b)
             elif self.neigh_type == NeighType.REVERSE or adhoc_neigh == 2:
                 sn = sn[:a]+sn[a:b][::-1]+sn[b:]
+                positions = tuple(range(a, b))
             
-            neighs.append([sn, (a, b), math.inf])  # Neighbor, action, fitness
+            neighs.append([sn, (a, b), math.inf, positions])  # Neighbor, action, fitness, changed positions
             count -= 1
         return neighs
 
@@ -0,0 +1,164 @@
+# Gilmore-Lawler lower bound for the Quadratic Assignment Problem.
+# The bound of an instance is cached next to it ("data/tai12a.dat" -> "data/tai12a.dat.glb"),
+# so it is only computed once per instance.
+
+import os
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+def _hungarian(cost):
+    """
+    Solves the linear assignment problem with the Hungarian algorithm (shortest augmenting
+    paths with potentials), where the inner loop over the columns is vectorized.
+    Used when scipy is not available.
+
+    Args:
+        cost (np.ndarray): A square cost matrix.
+
+    Returns:
+        tuple: The row indices and the assigned column indices, as in
+            `scipy.optimize.linear_sum_assignment`.
+    """
+    n = cost.shape[0]
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    p = np.zeros(n + 1, dtype=int)  # p[j]: row (1-based) assigned to column j
+    way = np.zeros(n + 1, dtype=int)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(n + 1, np.inf)
+        used = np.zeros(n + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            js = np.flatnonzero(~used)
+            cur = cost[i0 - 1, js - 1] - u[i0] - v[js]
+            better = cur < minv[js]
+            minv[js[better]] = cur[better]
+            way[js[better]] = j0
+            j1 = js[np.argmin(minv[js])]
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0 != 0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    cols = np.zeros(n, dtype=int)
+    cols[p[1:] - 1] = np.arange(n)
+    return np.arange(n), cols
+
+def solve_assignment(cost):
+    """
+    Solves the linear assignment problem for a square cost matrix.
+
+    Args:
+        cost (np.ndarray): A square cost matrix.
+
+    Returns:
+        tuple: The row indices and the assigned column indices.
+    """
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(cost)
+    return _hungarian(cost.astype(float))
+
+def gilmore_lawler_bound(d, f):
+    """
+    Computes the Gilmore-Lawler lower bound of a QAP instance with the cost
+    `sum(d[i][j] * f[sol[i]][sol[j]])`.
+
+    The cost of assigning `i` to `k` is bounded by `d[i][i] * f[k][k]` plus the minimal
+    scalar product of the off-diagonal row `i` of `d` (sorted ascending) and the
+    off-diagonal row `k` of `f` (sorted descending). All these products are computed at
+    once as a single matrix product, and the bound is the optimal assignment of that
+    cost matrix.
+
+    Args:
+        d (list[list[int]]): The distance matrix.
+        f (list[list[int]]): The flow matrix.
+
+    Returns:
+        int: The lower bound.
+    """
+    d = np.asarray(d, dtype=np.int64)
+    f = np.asarray(f, dtype=np.int64)
+    n = d.shape[0]
+    off_diag = ~np.eye(n, dtype=bool)
+    d_rows = np.sort(d[off_diag].reshape(n, n - 1), axis=1)
+    f_rows = np.sort(f[off_diag].reshape(n, n - 1), axis=1)[:, ::-1]
+    cost = np.outer(np.diag(d), np.diag(f)) + d_rows @ f_rows.T
+    rows, cols = solve_assignment(cost)
+    return int(cost[rows, cols].sum())
+
+def read_cached_lower_bound(data_file):
+    """
+    Reads the cached Gilmore-Lawler lower bound of an instance.
+
+    Args:
+        data_file (str): The path to the instance file.
+
+    Returns:
+        int: The cached lower bound, or None if the cache is missing, older than the
+            instance or unreadable.
+    """
+    cache_file = data_file + ".glb"
+    try:
+        if os.path.getmtime(cache_file) < os.path.getmtime(data_file):
+            return None
+        with open(cache_file, "r") as file:
+            return int(file.read().strip())
+    except (OSError, ValueError):
+        return None
+
+def load_lower_bound(data_file, d, f):
+    """
+    Returns the Gilmore-Lawler lower bound of an instance, reading it from the cache
+    file next to the instance if it is up to date, or computing and caching it otherwise.
+
+    Args:
+        data_file (str): The path to the instance file.
+        d (list[list[int]]): The distance matrix of the instance.
+        f (list[list[int]]): The flow matrix of the instance.
+
+    Returns:
+        int: The lower bound.
+    """
+    bound = read_cached_lower_bound(data_file)
+    if bound is not None:
+        return bound
+    bound = gilmore_lawler_bound(d, f)
+    cache_file = data_file + ".glb"
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w") as file:
+            file.write(f"{bound}\n")
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return bound
+
+def gap(fitness, lower_bound):
+    """
+    Computes the relative gap of a fitness value to a lower bound.
+
+    Args:
+        fitness (int): The fitness value of a solution.
+        lower_bound (int): The lower bound of the instance.
+
+    Returns:
+        float: The gap `(fitness - lower_bound) / lower_bound`.
+    """
+    if lower_bound <= 0:
+        return float("inf") if fitness > lower_bound else 0.0
+    return (fitness - lower_bound) / lower_bound
@@ -9,6 +9,7 @@ from matplotlib import cm
 import numpy as np
 
 from ranking import rank_it
+from bounds import read_cached_lower_bound
 
 # TODO: Set an equal maximum range for each file. (tai12a be 350000) for instance, or the maximum of all different cases.
 # TODO: ... needs preprocessing of the data to find the maximum range for each file.
@@ -69,8 +70,14 @@ def generate_best_graphs(best_improvements, output_dir="results"):
         for file_name, runs in files.items():
             fig, ax = plt.subplots(figsize=(10, 5))  # wider to make space
 
+            best_known = best_solutions.get(file_name)
+            lower_bound = read_cached_lower_bound(os.path.join("data", file_name))
+
             ax.set_yscale('log')
-            ax.set_ylim(ranges[file_name][0], ranges[file_name][1])
+            y_min = ranges[file_name][0]
+            if lower_bound is not None:
+                y_min = min(y_min, (lower_bound*19)//20)
+            ax.set_ylim(y_min, ranges[file_name][1])
             ax.set_xlim(0, 4000)
 
             info = configs[case_name]
@@ -113,7 +120,10 @@ def generate_best_graphs(best_improvements, output_dir="results"):
             ax.plot(x_range, avg_y, color='black', label='Average', linewidth=2)
             ax.fill_between(x_range, avg_y - std_y, avg_y + std_y, color='gray', alpha=0.3, label='±1 Std Dev')
             
-            ax.axhline(y=best_solutions[file_name], color='red', linestyle='--', label='Best Known Solution')
+            if best_known is not None:
+                ax.axhline(y=best_known, color='red', linestyle='--', label='Best Known Solution')
+            if lower_bound is not None:
+                ax.axhline(y=lower_bound, color='blue', linestyle=':', label='Gilmore-Lawler Bound')
             
 
             ax.set_title(f'{case_name} - {file_name}')
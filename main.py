@@ -2,9 +2,12 @@ import argparse
 import os
 import json
 from copy import deepcopy as cp
+from concurrent.futures import ProcessPoolExecutor
 
-from QAP import QAP, NeighType
+from QAP import QAP, NeighType, make_rng
 from taboo import TabooSearch
+from bounds import gap as lb_gap
+from progress import MetricsFileWriter
 
 results_dir = "results"
 
@@ -34,6 +37,18 @@ def parse_args():
     parser.add_argument("-s", "--seed", type=int, default=0,
                         help="Random seed for the Taboo search")
 
+    parser.add_argument("-g", "--gap", type=float, default=0.0,
+                        help="Stop a run once its relative gap to the lower bound is reached")
+
+    parser.add_argument("-m", "--metrics-file", type=str, default=None,
+                        help="Path to a Prometheus textfile where the progress of the runs is written")
+
+    parser.add_argument("-p", "--progress-interval", type=float, default=10.0,
+                        help="Minimum number of seconds between two progress updates")
+
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of runs executed in parallel")
+
     args = parser.parse_args()
 
     # Normalize test_all and analyze to True/False
@@ -67,6 +82,34 @@ def load_configurations(filename):
         configurations = json.load(f)
     return configurations
 
+def run_taboo_search(task):
+    """
+    Runs the Taboo Search once on a QAP instance.
+
+    The random generator of the run is derived from the master seed, the case, the instance
+    and the run index, so the run is reproducible whether it is executed serially or in a pool.
+
+    Args:
+        task (dict): The parameters of the run, with the keys `data_filepath`, `instance`,
+                     `case`, `run`, `seed`, `tenure`, `neigh_type`, `use_frequencies`,
+                     `iterations`, `lower_bound`, `gap`, `metrics_file` and `progress_interval`.
+
+    Returns:
+        tuple: The best solution found and the tracked best fitness values of the run.
+    """
+    rng = make_rng(task["seed"], task["case"], task["instance"], task["run"])
+    qap = QAP(task["data_filepath"], tenure=task["tenure"], neigh_type=task["neigh_type"],
+              use_frequencies=task["use_frequencies"], rng=rng)
+    progress_callback = None
+    if task["metrics_file"] is not None:
+        progress_callback = MetricsFileWriter(task["metrics_file"],
+                                              labels={"instance": task["instance"], "case": task["case"],
+                                                      "run": task["run"]+1})
+    TS = TabooSearch(qap, iterations=task["iterations"], lower_bound=task["lower_bound"], gap=task["gap"],
+                     progress_callback=progress_callback, progress_interval=task["progress_interval"])
+    best = TS.run()
+    return best, TS.tracked_bests
+
 def save_results_to_markdown(filename, results):
     """
     Save the results of the Taboo Search runs to a markdown file.
@@ -126,6 +169,7 @@ if __name__ == "__main__":
         conf_results = {"case1": cp(results)}
         print("------------------", conf_results)
 
+    pool = ProcessPoolExecutor(args.jobs) if args.jobs > 1 else None
     for con_r in conf_results.keys():
         results = conf_results[con_r]
         best_improvements = conf_best_improvements[con_r]
@@ -146,25 +190,37 @@ if __name__ == "__main__":
             if not os.path.exists(data_filepath):
                 print(f"File {data_filepath} does not exist.")
                 exit(1)
-            if f not in best_solutions:
-                print(f"File {f} not in best solutions dictionary.")
-                exit(1)
+            best_known = best_solutions.get(f)
 
             print(f"Running Taboo Search for QAP on \"{f}\" for test case {con_r}")
-            print(f"Best known solution: {best_solutions[f]}")
+            print(f"Best known solution: {best_known if best_known is not None else 'unknown'}")
+            lower_bound = QAP(data_filepath).lower_bound()
+            print(f"Gilmore-Lawler lower bound: {lower_bound}")
 
+            tasks = []
             for i in range(runs):
-                # Setup and run Taboo Search on the QAP instance
-                qap = QAP(data_filepath, tenure=tenure, neigh_type=neigh_type, use_frequencies=use_frequencies)
-                TS = TabooSearch(qap, iterations=iterations)
-                best = TS.run()
-                
+                metrics_file = args.metrics_file
+                if metrics_file is not None and pool is not None:
+                    # Parallel runs must not overwrite each other's metrics file
+                    root, ext = os.path.splitext(metrics_file)
+                    metrics_file = f"{root}.run{i+1}{ext}"
+                tasks.append({
+                    "data_filepath": data_filepath, "instance": f, "case": con_r, "run": i, "seed": args.seed,
+                    "tenure": tenure, "neigh_type": neigh_type, "use_frequencies": use_frequencies,
+                    "iterations": iterations, "lower_bound": lower_bound, "gap": args.gap,
+                    "metrics_file": metrics_file, "progress_interval": args.progress_interval,
+                })
+
+            # Setup and run Taboo Search on the QAP instance
+            outcomes = pool.map(run_taboo_search, tasks) if pool is not None else map(run_taboo_search, tasks)
+            for i, (best, tracked_bests) in enumerate(outcomes):
                 results[f].append(best[2])
-                best_improvements[f].append(TS.tracked_bests)
+                best_improvements[f].append(tracked_bests)
 
                 # Result and statistics
                 print(" " + "-" * 92)
-                print(f"| {'Run:':<5}{i+1:<5}| {'Iterations:':<12}{iterations:<7}| {'Tenure:':<8}{tenure:<4}| {'Best Fitness:':<14}{best[2]:<10} | diff: {best[2] - best_solutions[f]:<10} |")
+                print(f"| {'Run:':<5}{i+1:<5}| {'Iterations:':<12}{iterations:<7}| {'Tenure:':<8}{tenure:<4}| {'Best Fitness:':<14}{best[2]:<10} | diff: {best[2] - best_known if best_known is not None else '-':<10} |")
+                print(f"| {'Gap to lower bound:':<20}{f'{lb_gap(best[2], lower_bound)*100:.2f}%':<70} |")
                 if len(best[0]) > 20:
                     print(f"| Best solution: {', '.join([str(b+1) for b in best[0][:18]])+', ...':<75} |")
                 else:
@@ -173,9 +229,13 @@ if __name__ == "__main__":
             # Final statistics
             print(" " + "-" * 92)
             print("Average best fitness: ", sum(results[f])//runs)
-            print(f"Best fitness found {min(results[f])}, best known {best_solutions[f]}, diff: {min(results[f]) - best_solutions[f]}")
+            if best_known is not None:
+                print(f"Best fitness found {min(results[f])}, best known {best_known}, diff: {min(results[f]) - best_known}")
+            print(f"Best fitness found {min(results[f])}, lower bound {lower_bound}, gap: {lb_gap(min(results[f]), lower_bound)*100:.2f}%")
             print()
 
+    if pool is not None:
+        pool.shutdown()
     if not os.path.exists(results_dir):
         os.makedirs(results_dir)
     save_results_to_markdown("results.md", conf_results)
@@ -0,0 +1,62 @@
+# Export the progress events of the Taboo Search as a Prometheus textfile.
+# The metrics file is rewritten atomically on every event, so it can be scraped at any time
+# (e.g. by the textfile collector of the node exporter) while a long run is in progress.
+
+import os
+
+metrics = {
+    "iteration": "Current iteration of the Taboo Search run.",
+    "iterations": "Maximum number of iterations of the Taboo Search run.",
+    "current_fitness": "Fitness value of the current solution.",
+    "best_fitness": "Best fitness value found so far.",
+    "evaluations_per_second": "Fitness evaluations per second since the start of the run.",
+    "elapsed_seconds": "Seconds elapsed since the start of the run.",
+    "eta_seconds": "Estimated seconds until the run reaches its maximum number of iterations.",
+    "done": "1 if the run finished, otherwise 0.",
+}
+
+class MetricsFileWriter:
+    """
+    A progress callback which writes every progress event to a Prometheus-textfile-style metrics file.
+    Attributes:
+        path (str): The path to the metrics file.
+        labels (dict): Labels added to every metric (e.g. instance, case and run).
+        prefix (str): The prefix of the metric names.
+    """
+    def __init__(self, path, labels=None, prefix="taboo_search_"):
+        self.path = path
+        self.labels = labels or {}
+        self.prefix = prefix
+
+    def format(self, event):
+        """
+        Formats a progress event in the Prometheus text exposition format.
+
+        Args:
+            event (dict): A progress event emitted by `TabooSearch`.
+
+        Returns:
+            str: The formatted metrics.
+        """
+        labels = ",".join(f'{k}="{v}"' for k, v in self.labels.items())
+        labels = f"{{{labels}}}" if labels else ""
+        lines = []
+        for name, help_text in metrics.items():
+            metric = self.prefix + name
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{labels} {float(event[name])}")
+        return "\n".join(lines) + "\n"
+
+    def __call__(self, event):
+        # Exporting the metrics must never abort the search, so a failed update is skipped
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self.format(event))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
@@ -1,5 +1,8 @@
+import time
+
 class TabooSearch:
-    def __init__(self, problem, iterations=1000, tenure=5):
+    def __init__(self, problem, iterations=1000, tenure=5, lower_bound=None, gap=0.0,
+                 progress_callback=None, progress_interval=10.0):
         """
         Initializes the Taboo search algorithm.
         Args:
@@ -9,12 +12,29 @@ class TabooSearch:
                                         Defaults to 1000.
             tenure (int, optional): The tenure of the Taboo list, which determines how 
                                     long a move remains forbidden. Defaults to 5.
+            lower_bound (int, optional): A lower bound on the fitness value (e.g. the
+                                         Gilmore-Lawler bound of the problem). If given, the
+                                         search stops early once the best fitness is within
+                                         `gap` of it. Defaults to None.
+            gap (float, optional): The relative gap to the lower bound at which the search
+                                   stops. Defaults to 0.0.
+            progress_callback (callable, optional): Called with a progress event (dict) at
+                                                    most every `progress_interval` seconds,
+                                                    and once when the run is finished.
+                                                    Defaults to None.
+            progress_interval (float, optional): The minimum number of seconds between two
+                                                 progress events. Defaults to 10.0.
         """
         # TODO: Define a General Type for different Problems
         self.problem = problem
         self.n_iterations = iterations
         self.iteration = 0
         self.tenure = tenure
+        self.lower_bound = lower_bound
+        self.gap = gap
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.evaluations = 0
         self.best_tracker = []
 
         self._init()
@@ -66,14 +86,17 @@ class TabooSearch:
         """
         for i in range(len(self.candidates)):
             self.candidates[i][2] = self.problem.fitness_f(self.candidates[i][0])
+        self.evaluations += len(self.candidates)
 
     def _choose_best_solution(self):
         """
         Selects the best solution from the list of candidate solutions based on fitness value.
 
         This method iterates through the list of candidate solutions, identifies the one with 
-        the lowest fitness value (indicating the best solution), and marks it as taboo to 
-        prevent revisiting it in future iterations.
+        the lowest fitness value plus its frequency penalty (indicating the best solution), and
+        marks it as taboo to prevent revisiting it in future iterations. Candidates improving
+        the best solution found so far are not penalized (aspiration), so an improving move is
+        never passed over.
 
         Returns:
             tuple: The best candidate solution, represented as a tuple containing:
@@ -81,19 +104,28 @@ class TabooSearch:
                 - The solution itself (index 1).
                 - The fitness value of the solution (index 2).
         """
-        best_fitness = self.candidates[0][2]
+        penalties = self.problem.penalties(self.solution, self.candidates)
+        best_fitness = None
+        best_score = None
         best_ind = 0
         found_new_best = False
         new_best_fitness = None
-        for i in range(1, len(self.candidates)):
-            if self.candidates[i][2] < best_fitness:
-                best_fitness = self.candidates[i][2]
-                best_ind = i
-            if self.candidates[i][2] < self.best_solution[2]:
-                if new_best_fitness is None or self.candidates[i][2] < new_best_fitness:
+        for i in range(len(self.candidates)):
+            fitness = self.candidates[i][2]
+            score = fitness
+            if fitness < self.best_solution[2]:
+                if new_best_fitness is None or fitness < new_best_fitness:
                     found_new_best = True
-                    new_best_fitness = self.candidates[i][2]
-        if found_new_best or self.best_tracker == []:
+                    new_best_fitness = fitness
+            else:
+                score += penalties[i]
+            if best_score is None or score < best_score:
+                best_fitness = fitness
+                best_score = score
+                best_ind = i
+        if found_new_best:
+            self.best_tracker.append((self.iteration, new_best_fitness))
+        elif self.best_tracker == []:
             self.best_tracker.append((self.iteration, best_fitness))
         self.problem.add_taboo(self.candidates[best_ind][1])
         return self.candidates[best_ind]
@@ -103,15 +135,18 @@ class TabooSearch:
         Checks if the task has reached the maximum number of iterations.
 
         This method determines whether the current iteration count has reached
-        or exceeded the specified number of iterations (`n_iterations`). If the
-        maximum number of iterations is reached, it returns `True`. Otherwise,
-        it increments the iteration count and returns `False`.
+        or exceeded the specified number of iterations (`n_iterations`), or whether
+        the best fitness is within `gap` of `lower_bound`. If so, it returns `True`.
+        Otherwise, it increments the iteration count and returns `False`.
 
         Returns:
-            bool: `True` if the maximum number of iterations is reached, otherwise `False`.
+            bool: `True` if the search is done, otherwise `False`.
         """
         if self.iteration >= self.n_iterations:
             return True
+        if self.lower_bound is not None and \
+                self.best_solution[2] - self.lower_bound <= self.gap * self.lower_bound:
+            return True
         self.iteration += 1
 
     def _update_taboo(self):
@@ -125,6 +160,38 @@ class TabooSearch:
         """
         self.problem.update_taboo()
         
+    def _report_progress(self, done=False):
+        """
+        Emits a progress event to `progress_callback`, at most every `progress_interval`
+        seconds unless the run is done.
+
+        The event is a dictionary with the keys `iteration`, `iterations`, `current_fitness`,
+        `best_fitness`, `evaluations_per_second`, `elapsed_seconds`, `eta_seconds` and `done`.
+
+        Args:
+            done (bool, optional): Whether the run is finished. Defaults to False.
+        """
+        if self.progress_callback is None:
+            return
+        now = time.monotonic()
+        if not done and now - self._last_report < self.progress_interval:
+            return
+        self._last_report = now
+        elapsed = now - self._start_time
+        eta = 0.0
+        if not done and self.iteration > 0:
+            eta = elapsed / self.iteration * (self.n_iterations - self.iteration)
+        self.progress_callback({
+            "iteration": self.iteration,
+            "iterations": self.n_iterations,
+            "current_fitness": self.solution[2],
+            "best_fitness": self.best_solution[2],
+            "evaluations_per_second": self.evaluations / elapsed if elapsed > 0 else 0.0,
+            "elapsed_seconds": elapsed,
+            "eta_seconds": eta,
+            "done": done,
+        })
+
     @property
     def tracked_bests(self):
         """
@@ -151,15 +218,21 @@ class TabooSearch:
                 and contents of the solution depend on the specific implementation
                 of the algorithm.
         """
+        self._start_time = self._last_report = time.monotonic()
         while True:
             self._create_candidates()
             self._evaluate_solutions()
+            previous_solution = self.solution
             self.solution = self._choose_best_solution()
-            if self.solution[2] < self.best_solution[2]:
+            improved = self.solution[2] < self.best_solution[2]
+            if improved:
                 self.best_solution = self.solution[:]
+            self.problem.record_move(previous_solution, self.solution, improved)
             if self._task_done():
                 break
             
             self._update_taboo()
+            self._report_progress()
         self.best_tracker.append((self.iteration, self.best_solution[2]))
+        self._report_progress(done=True)
         return self.best_solution
@@ -0,0 +1,248 @@
+# Race Taboo Search configurations with successive halving.
+# Candidates are either sampled from parameter ranges or read from "configs.json".
+# Every round, each surviving candidate gets more runs on every instance, and only the
+# best fraction of them is kept for the next round. The tuned configuration is saved to
+# "results/tuned_config.json" in the same format as "configs.json".
+# All candidates are compared at the same number of iterations: a larger budget would always
+# win on quality alone, so the number of iterations is a setting of the race and is not raced.
+
+import argparse
+import os
+import json
+import random
+
+from QAP import QAP, NeighType, make_rng
+from taboo import TabooSearch
+
+results_dir = "results"
+
+default_ranges = {
+    "neigh_type": [0, 1, 2],
+    "use_frequencies": [True, False],
+    "tenure": [3, 5, 7, 10, 15],
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Race Taboo Search configurations for QAP")
+
+    parser.add_argument("-f", "--files", type=str, nargs="+", default=["tai12a.dat", "tai15a.dat", "tai17a.dat"],
+                        help="Data files (in 'data/') used for tuning")
+
+    parser.add_argument("-c", "--candidates", type=int, default=0,
+                        help="Number of configurations sampled from the ranges (0 to use 'configs.json')")
+
+    parser.add_argument("-i", "--iterations", type=int, default=1000,
+                        help="Number of iterations of every run, the same for all candidates")
+
+    parser.add_argument("-r", "--runs", type=int, default=1,
+                        help="Number of runs per instance given to every candidate in the first round")
+
+    parser.add_argument("-e", "--eta", type=int, default=2,
+                        help="Elimination factor: only 1/eta of the candidates survive a round")
+
+    parser.add_argument("-m", "--max-runs", type=int, default=10,
+                        help="Maximum number of runs per instance for a single candidate")
+
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="Random seed for sampling candidates and for the runs")
+
+    args = parser.parse_args()
+    if args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+    if args.eta < 2:
+        parser.error("--eta must be at least 2")
+    if args.max_runs < args.runs:
+        parser.error("--max-runs must be at least --runs")
+
+    return args
+
+def sample_configs(count, ranges=None, seed=0):
+    """
+    Samples distinct configurations from the given parameter ranges.
+
+    Args:
+        count (int): The number of configurations to sample.
+        ranges (dict, optional): A dictionary mapping each configuration key to a list of
+                                 allowed values. Defaults to `default_ranges`.
+        seed (int, optional): The seed of the sampler. Defaults to 0.
+
+    Returns:
+        dict: A dictionary of configurations, in the same format as "configs.json".
+    """
+    if ranges is None:
+        ranges = default_ranges
+    space = 1
+    for values in ranges.values():
+        space *= len(values)
+    count = min(count, space)
+
+    rng = random.Random(seed)
+    configs = {}
+    seen = set()
+    while len(configs) < count:
+        config = {key: rng.choice(values) for key, values in ranges.items()}
+        key = tuple(config[k] for k in sorted(config))
+        if key in seen:
+            continue
+        seen.add(key)
+        configs[f"sample{len(configs)+1}"] = config
+    return configs
+
+def equal_budget(configs, iterations):
+    """
+    Sets the same number of iterations for all the configurations, and drops the
+    configurations which become duplicates of an earlier one.
+
+    Args:
+        configs (dict): The configurations, in the same format as "configs.json".
+        iterations (int): The number of iterations of every run.
+
+    Returns:
+        dict: The distinct configurations with `iterations` set.
+    """
+    result = {}
+    seen = set()
+    for case_name, config in configs.items():
+        config = dict(config, iterations=iterations)
+        key = tuple(config[k] for k in sorted(config))
+        if key in seen:
+            continue
+        seen.add(key)
+        result[case_name] = config
+    return result
+
+def run_config(config, data_filepath, rng=None):
+    """
+    Runs the Taboo Search once on a QAP instance using the given configuration.
+
+    Args:
+        config (dict): A configuration with the keys `neigh_type`, `use_frequencies`,
+                       `iterations` and `tenure`.
+        data_filepath (str): The path to the QAP instance.
+        rng (np.random.Generator, optional): The random generator of the run. Defaults to None.
+
+    Returns:
+        int: The best fitness found by the run.
+    """
+    qap = QAP(data_filepath, tenure=config["tenure"], neigh_type=NeighType(config["neigh_type"]),
+              use_frequencies=config["use_frequencies"], rng=rng)
+    TS = TabooSearch(qap, iterations=config["iterations"])
+    return TS.run()[2]
+
+def score_candidates(scores, reference):
+    """
+    Computes the average relative deviation of every candidate from the reference values.
+
+    Args:
+        scores (dict): Maps each candidate to a dictionary of `file -> list of fitness values`.
+        reference (dict): Maps each file to the best fitness observed on it.
+
+    Returns:
+        dict: Maps each candidate to its average relative deviation (lower is better).
+    """
+    result = {}
+    for case_name, files in scores.items():
+        deviations = []
+        for f, values in files.items():
+            deviations.extend((v - reference[f]) / reference[f] for v in values)
+        result[case_name] = sum(deviations) / len(deviations)
+    return result
+
+def race(configs, files, runs=1, eta=2, max_runs=10, seed=0, verbose=True):
+    """
+    Races the configurations against each other with successive halving.
+
+    All candidates are run `runs` times on every instance. The worst candidates are then
+    dropped so that only 1/eta of them survive, and the survivors get eta times as many
+    runs in the next round. The race stops when a single candidate survives or when the
+    candidates reached `max_runs` runs per instance.
+
+    Args:
+        configs (dict): The candidate configurations, in the same format as "configs.json".
+        files (list): The names of the data files (in "data/") to tune on.
+        runs (int, optional): The number of runs per instance in the first round. Defaults to 1.
+        eta (int, optional): The elimination factor. Defaults to 2.
+        max_runs (int, optional): The maximum number of runs per instance. Defaults to 10.
+        seed (int, optional): The master seed of the runs, see `QAP.make_rng`. Defaults to 0.
+        verbose (bool, optional): Whether to print the progress. Defaults to True.
+
+    Returns:
+        tuple: The name of the winning configuration, its average relative deviation, and
+            the fraction of the iterations of the exhaustive grid (every candidate run
+            `max_runs` times on every instance) which was spent.
+    """
+    scores = {c: {f: [] for f in files} for c in configs}
+    reference = {}
+    survivors = list(configs.keys())
+    spent = 0
+    done_runs = 0
+    round_runs = runs
+    round_num = 0
+
+    while True:
+        round_num += 1
+        round_runs = min(round_runs, max_runs - done_runs)
+        for case_name in survivors:
+            for f in files:
+                data_filepath = os.path.join("data", f)
+                for _ in range(round_runs):
+                    rng = make_rng(seed, case_name, f, len(scores[case_name][f]))
+                    fitness = run_config(configs[case_name], data_filepath, rng=rng)
+                    scores[case_name][f].append(fitness)
+                    reference[f] = min(reference.get(f, fitness), fitness)
+                    spent += configs[case_name]["iterations"]
+        done_runs += round_runs
+
+        deviations = score_candidates({c: scores[c] for c in survivors}, reference)
+        survivors.sort(key=lambda c: deviations[c])
+        if verbose:
+            print(f"Round {round_num}: {len(survivors)} candidates, {done_runs} run(s) per instance")
+            for case_name in survivors:
+                print(f"    {case_name:<10} deviation: {deviations[case_name]:.5f}")
+
+        survivors = survivors[:max(1, len(survivors) // eta)]
+        if len(survivors) == 1 or done_runs >= max_runs:
+            break
+        round_runs *= eta
+
+    exhaustive = sum(configs[c]["iterations"] for c in configs) * len(files) * max_runs
+    return survivors[0], deviations[survivors[0]], spent / exhaustive
+
+def save_tuned_config(filename, case_name, config):
+    """
+    Save the tuned configuration to a JSON file.
+
+    Args:
+        filename (str): The name of the JSON file to save.
+        case_name (str): The name of the tuned configuration.
+        config (dict): The tuned configuration.
+    """
+    if not os.path.exists(results_dir):
+        os.makedirs(results_dir)
+    filename = os.path.join(results_dir, filename)
+    with open(filename, "w") as f:
+        json.dump({case_name: config}, f, indent=4)
+    print(f"Tuned configuration saved to {filename}")
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.candidates > 0:
+        configs = sample_configs(args.candidates, seed=args.seed)
+    else:
+        with open("configs.json", "r") as f:
+            configs = json.load(f)
+    configs = equal_budget(configs, args.iterations)
+
+    for f in args.files:
+        if not os.path.exists(os.path.join("data", f)):
+            print(f"File {os.path.join('data', f)} does not exist.")
+            exit(1)
+
+    best, deviation, cost = race(configs, args.files, runs=args.runs, eta=args.eta, max_runs=args.max_runs,
+                                 seed=args.seed)
+    print(f"Tuned configuration: {best} {configs[best]}")
+    print(f"Average deviation from the best found: {deviation:.5f}")
+    print(f"CPU spent: {cost*100:.1f}% of the exhaustive grid")
+    save_tuned_config("tuned_config.json", best, configs[best])